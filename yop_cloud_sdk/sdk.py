@@ -1,20 +1,242 @@
+import http.client
+import io
+import math
+import mmap
 import os.path
+import queue
+import shutil
 import subprocess
-from typing import Iterable
-from urllib.parse import urljoin
+import sys
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+from urllib.parse import urlsplit
 
 import requests
+import urllib3
 from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 from tabulate import tabulate
 
-DOWNLOAD_CHUNK_SIZE = 64 * 1024  # kb
+if TYPE_CHECKING:
+    import httpx
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # kb
+PBAR_UPDATE_SIZE = 1024 * 1024  # bytes accumulated between progress bar updates
+SENDFILE_BLOCK_SIZE = 8 * 1024 * 1024  # bytes per sendfile call, between progress updates
+SENDFILE_TIMEOUT = 60  # seconds without progress on the sendfile connection before giving up
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+MULTIPART_MAX_WORKERS = 8
+POOL_MAXSIZE = 32
+SMALL_FILE_SIZE = 1024 * 1024  # files up to this size are sent in a single request
+IS_DIR_CACHE_SIZE = 1024  # server paths remembered by _is_file_on_server_dir
+
+
+def progress_bar(total: int | None, desc: str) -> tqdm:
+    """
+    Creates a byte progress bar. YOP_PROGRESS=on|off forces it on or off; by default (auto)
+    it is shown only when stderr is a terminal, so redirected logs and CI runs skip redrawing.
+    """
+    mode = os.environ.get('YOP_PROGRESS', 'auto').lower()
+    if mode == 'on':
+        disable = False
+    elif mode == 'off':
+        disable = True
+    else:
+        disable = sys.stderr is None or not sys.stderr.isatty()
+
+    return tqdm(
+        total=total,
+        unit='B',
+        unit_scale=True,
+        desc=desc,
+        disable=disable,
+        mininterval=0.25,
+        miniters=PBAR_UPDATE_SIZE,
+        lock_args=(False,),
+    )
+
+
+class ProgressCounter:
+    """
+    Accumulates transferred bytes and passes them to a progress bar in batches of PBAR_UPDATE_SIZE.
+    """
+
+    def __init__(self, pbar: tqdm):
+        self._pbar = pbar
+        self._pending = 0
+
+    def update(self, n: int) -> None:
+        self._pending += n
+        if self._pending >= PBAR_UPDATE_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._pbar.update(self._pending)
+            self._pending = 0
+
+
+class BufferPool:
+    """
+    Bounded pool of reusable buffers shared by concurrent transfers.
+    Buffers are allocated lazily and acquire() blocks while all of them are in use.
+    """
+
+    def __init__(self, buffer_size: int, max_buffers: int):
+        self.buffer_size = buffer_size
+        self._slots = threading.Semaphore(max_buffers)
+        self._free = queue.SimpleQueue()
+
+    def acquire(self) -> bytearray:
+        self._slots.acquire()
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray) -> None:
+        self._free.put(buffer)
+        self._slots.release()
 
 
-def generate_chunks_from_file(file_descriptor, pbar):
-    while chunk := file_descriptor.read(DOWNLOAD_CHUNK_SIZE):
-        pbar.update(len(chunk))
-        yield chunk
+class PooledChunkReader:
+    """
+    Iterable over chunks of a file, read into a buffer borrowed from a BufferPool.
+    Every chunk is a view of the same buffer: the HTTP layer sends it before asking for the next one.
+    """
+
+    def __init__(self, file_descriptor, pbar: tqdm, pool: BufferPool):
+        self._file_descriptor = file_descriptor
+        self._pbar = pbar
+        self._pool = pool
+
+    def __iter__(self):
+        progress = ProgressCounter(self._pbar)
+        buffer = self._pool.acquire()
+        try:
+            view = memoryview(buffer)
+            while n := self._file_descriptor.readinto(view):
+                progress.update(n)
+                yield view[:n]
+        finally:
+            self._pool.release(buffer)
+        progress.flush()
+
+
+class MappedFileReader(io.RawIOBase):
+    """
+    Read-only file-like view of a memory-mapped file, handed to requests as the request body.
+    read() returns zero-copy memoryview slices of the map instead of bytes, so file bytes go from
+    the page cache to the socket. Its length is the file size, which lets requests send a Content-Length.
+
+    The file must not be truncated by another process while it is being sent: touching mapped pages past
+    the new end of the file raises SIGBUS, which kills the interpreter. A size change that has not been hit
+    yet is detected before the last chunk goes out and raises instead, so the server never gets a full body.
+    """
+
+    def __init__(self, file_descriptor, pbar: tqdm):
+        super().__init__()
+        self._file_descriptor = file_descriptor
+        self._file_size = os.fstat(file_descriptor.fileno()).st_size
+        self._progress = ProgressCounter(pbar)
+        self._position = 0
+        self._chunk = None
+        self._mapped_file = None
+        self._view = None
+        if self._file_size:  # empty files cannot be mapped
+            self._mapped_file = mmap.mmap(file_descriptor.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                self._mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+            self._view = memoryview(self._mapped_file)
+
+    def __len__(self) -> int:
+        return self._file_size
+
+    def readable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def read(self, size: int = -1) -> memoryview | bytes:
+        # the previous chunk has been sent; drop the export so the map can be closed
+        self._release_chunk()
+        end = self._file_size if size < 0 else min(self._position + size, self._file_size)
+        if end <= self._position:
+            self._progress.flush()
+            return b''
+        if end == self._file_size and os.fstat(self._file_descriptor.fileno()).st_size != self._file_size:
+            raise RuntimeError('Upload failed: file size changed while it was being sent')
+
+        self._chunk = self._view[self._position:end]
+        self._progress.update(end - self._position)
+        self._position = end
+        return self._chunk
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._release_chunk()
+            if self._mapped_file is not None:
+                self._view.release()
+                self._mapped_file.close()
+            self._progress.flush()
+        super().close()
+
+    def _release_chunk(self) -> None:
+        if self._chunk is not None:
+            self._chunk.release()
+            self._chunk = None
+
+
+class TransferAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections read file-like request bodies in DOWNLOAD_CHUNK_SIZE blocks
+    instead of urllib3's default 16 KiB. Only urllib3 2+ accepts the blocksize pool option.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        if int(urllib3.__version__.split('.')[0]) >= 2:
+            kwargs.setdefault('blocksize', DOWNLOAD_CHUNK_SIZE)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def generate_chunks_from_process(process: subprocess.Popen, pbar, pool: BufferPool):
+    yield from PooledChunkReader(process.stdout, pbar, pool)
+    # all data chunks are sent by now; raising here withholds only the terminating zero-length chunk
+    # of the chunked encoding, so the server never sees a truncated archive as a complete upload
+    if process.wait() != 0:
+        raise RuntimeError(f'Failed to archive folder: {process.args[0]} exited with code {process.returncode}')
+
+
+class ResponseReader:
+    """
+    File-like view of a streamed response body that reports read bytes to a progress bar.
+    """
+
+    def __init__(self, response: Response, pbar: tqdm):
+        self._raw = response.raw
+        self._progress = ProgressCounter(pbar)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size if size >= 0 else None, decode_content=True)
+        if data:
+            self._progress.update(len(data))
+        else:
+            self._progress.flush()
+        return data
+
+    def flush(self) -> None:
+        self._progress.flush()
 
 
 def print_ls(list_files):
@@ -25,53 +247,175 @@ def print_ls(list_files):
 
 
 class YOPStorage:
-    def __init__(self, host_url: str, token: str):
-        self._host_url = host_url
+    def __init__(self, host_url: str, token: str, transport: str = 'http1'):
+        """
+        :param host_url: The URL of the yop-cloud server.
+        :param token: The access token.
+        :param transport: 'http1' (default) or 'http2'. With 'http2', ls and delete requests are multiplexed
+            over one HTTP/2 connection (requires the ``http2`` extra; HTTP/2 is negotiated over HTTPS only).
+        """
+        if transport not in ('http1', 'http2'):
+            raise ValueError(f'Unknown transport "{transport}", expected "http1" or "http2"')
+
+        self._host_url = host_url if host_url.endswith('/') else f'{host_url}/'
+        self._upload_prefix = f'{self._host_url}upload/'
+        self._download_prefix = f'{self._host_url}download/'
+        self._delete_prefix = f'{self._host_url}delete/'
+        self._ls_prefix = f'{self._host_url}ls/'
+        # plain HTTP uploads are sent with socket.sendfile; URL credentials are left to requests,
+        # which turns them into Basic auth
+        split_host_url = urlsplit(self._host_url)
+        self._use_sendfile = split_host_url.scheme == 'http' and split_host_url.username is None
         self._token = token
 
-        self._headers = {"Authorization": f"Bearer {self._token}"}
+        # read-only, so per-call headers are always built on a copy
+        self._headers = MappingProxyType({"Authorization": f"Bearer {self._token}"})
+
+        # one connection pool for all calls, so consecutive requests skip the TCP/TLS handshake
+        self._session = requests.Session()
+        adapter = TransferAdapter(
+            pool_connections=POOL_MAXSIZE,
+            pool_maxsize=POOL_MAXSIZE,
+            # only reads are retried: a retried DELETE may hit 404 after the first attempt already succeeded
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        # client for metadata calls (ls, delete); transfers always go through the requests session
+        self._metadata_client = self._session
+        if transport == 'http2':
+            try:
+                import httpx
+                # no timeout, like the requests session; no custom transport either, since passing one
+                # stops httpx from mounting the HTTP(S)_PROXY / NO_PROXY proxies. Unlike the session,
+                # failed requests are not retried.
+                self._metadata_client = httpx.Client(http2=True, timeout=None)
+            except ImportError as e:
+                raise ImportError(
+                    'transport="http2" requires httpx with HTTP/2 support: pip install "yop-cloud-sdk[http2]"'
+                ) from e
+
+        # read buffers shared by all transfers of this instance
+        self._buffer_pool = BufferPool(DOWNLOAD_CHUNK_SIZE, POOL_MAXSIZE)
+
+        # pigz compresses on all cores and still produces the gzip archive the server expects
+        pigz_path = shutil.which('pigz')
+        self._tar_compress_args = [f'--use-compress-program={pigz_path}'] if pigz_path else ['-z']
+
+        # server path -> whether it is a directory, filled by _is_file_on_server_dir
+        self._is_dir_cache: dict[str, bool] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
-    def upload(self, src_file_path: str, dst_file_path: str, force: bool = False):
+    def invalidate_cache(self):
+        """
+        Forgets which server paths are directories. Call it after the server content was changed by another client.
+        """
+        self._is_dir_cache.clear()
+
+    def close(self):
+        """
+        Closes the underlying HTTP session and its pooled connections.
+        """
+        self._session.close()
+        if self._metadata_client is not self._session:
+            self._metadata_client.close()
+
+    def upload(self, src_file_path: str, dst_file_path: str, force: bool = False, multipart: bool = False):
         """
         Uploads a file to the specified destination directory on the server.
 
         :param src_file_path: The path to the source file to be uploaded.
         :param dst_file_path: The path to the destination file on the server.
+        :param multipart: If True, uploads the file in parts over several parallel connections.
+            Ignored for directories and for files up to SMALL_FILE_SIZE, which are sent in a single request.
         """
 
         if not os.path.exists(src_file_path):
             raise RuntimeError(f'File {src_file_path} not found')
 
-        isdir = os.path.isdir(src_file_path)
-        if isdir:
-            src_dir_path = src_file_path
-            src_parent_dir_path, src_dir_basename = os.path.split(src_dir_path)
-            src_file_path = os.path.join(src_parent_dir_path,  f'.{src_dir_basename}.tar.gz')
+        self.invalidate_cache()
+
+        if os.path.isdir(src_file_path):
+            # stream the archive straight from tar's stdout, so it is never written to disk
+            tar_process = subprocess.Popen(
+                ['tar', '--disable-copyfile', '-c', *self._tar_compress_args, '--no-xattrs',
+                 '-f', '-', '-C', src_file_path, '.'],
+                stdout=subprocess.PIPE,
+                bufsize=0
+            )
             try:
-                subprocess.run(
-                    ['tar', '--disable-copyfile', '-cz', '--no-xattrs', '-f', src_file_path, '-C', src_dir_path, '.'],
-                    check=True
-                )
-            except subprocess.CalledProcessError as e:
-                raise RuntimeError(f'Failed to archive folder: {e}')
+                with progress_bar(total=None, desc=src_file_path) as pbar:
+                    self._do_upload(
+                        file_chunks_generator=generate_chunks_from_process(tar_process, pbar, self._buffer_pool),
+                        dst_file_path=dst_file_path,
+                        isdir=True,
+                        file_size=None,
+                        force=force
+                    )
+            finally:
+                if tar_process.poll() is None:
+                    tar_process.kill()
+                tar_process.stdout.close()
+                tar_process.wait()
+            return
 
         file_size = os.path.getsize(src_file_path)
 
-        try:
+        if file_size <= SMALL_FILE_SIZE:
+            # one request with the whole body: no preflight, no progress bar, no chunked encoding
             with open(src_file_path, 'rb') as src_file:
-                with tqdm(total=file_size, unit='B', unit_scale=True, desc=src_file_path) as pbar:
-                    file_chunks_generator = generate_chunks_from_file(src_file, pbar)
-                    self._do_upload(
-                        file_chunks_generator=file_chunks_generator,
+                payload = src_file.read()
+            self._do_upload(
+                file_chunks_generator=payload,
+                dst_file_path=dst_file_path,
+                isdir=False,
+                file_size=file_size,
+                force=force,
+                check=False
+            )
+            return
+
+        with open(src_file_path, 'rb', buffering=0) as src_file:
+            with progress_bar(total=file_size, desc=src_file_path) as pbar:
+                if multipart:
+                    self._do_upload_multipart(
+                        src_file=src_file,
                         dst_file_path=dst_file_path,
-                        isdir=isdir,
                         file_size=file_size,
-                        force=force
+                        force=force,
+                        pbar=pbar
                     )
-        finally:
-            # remove temp folder archive
-            if isdir:
-                os.remove(src_file_path)
+                elif self._use_sendfile and not requests.utils.get_environ_proxies(self._upload_prefix):
+                    # plain HTTP without a proxy: let the kernel copy file bytes straight into the socket
+                    self._do_upload_sendfile(
+                        src_file=src_file,
+                        dst_file_path=dst_file_path,
+                        file_size=file_size,
+                        force=force,
+                        pbar=pbar
+                    )
+                else:
+                    # requests reads the body itself, no Python generator between it and the socket
+                    with MappedFileReader(src_file, pbar) as file_reader:
+                        self._do_upload(
+                            file_chunks_generator=file_reader,
+                            dst_file_path=dst_file_path,
+                            isdir=False,
+                            file_size=file_size,
+                            force=force
+                        )
 
     def download(self, src_file_path: str, dst_file_path: str):
         """
@@ -82,23 +426,39 @@ class YOPStorage:
         """
         dst_dir_path, dst_file_name = os.path.split(dst_file_path)
 
-        isdir = self._is_file_on_server_dir(src_file_path)
+        # the server reports whether the body is a directory archive, so no separate ls probe is needed
+        response = self._do_download(src_file_path, check=False)
+        is_archive = response.headers.get('X-Is-Archive')
+        if is_archive is not None:
+            self._check_download_response(response, src_file_path)
+            isdir = is_archive.lower() == 'true'
+        elif response.status_code == 404:
+            self._check_download_response(response, src_file_path)
+        else:
+            # legacy server: it does not report the kind of body and may refuse a directory
+            # requested without the archive header, so probe with ls and ask for the archive explicitly
+            try:
+                isdir = self._is_file_on_server_dir(src_file_path)
+                if isdir:
+                    response.close()
+                    response = self._do_download(src_file_path, isdir=True)
+                else:
+                    self._check_download_response(response, src_file_path)
+            except BaseException:
+                response.close()
+                raise
+
         if isdir:
             dst_dir_path = dst_file_path
-            dst_parent_dir_path, dst_dir_basename = os.path.split(dst_dir_path)
-            dst_file_path = os.path.join(dst_parent_dir_path, f'.{dst_dir_basename}.tar.gz')
 
         if dst_dir_path and not os.path.exists(dst_dir_path):
             os.makedirs(dst_dir_path)
 
-        self._do_download(src_file_path, dst_file_path, isdir)
-        if isdir:
-            try:
-                subprocess.run(['tar', '-xf', dst_file_path, '-C', dst_dir_path], check=True)
-            except subprocess.CalledProcessError as e:
-                raise RuntimeError(f'Failed to unzip folder: {e}')
-            finally:
-                os.remove(dst_file_path)
+        with response:
+            if isdir:
+                self._extract_response(response, dst_dir_path)
+            else:
+                self._save_response(response, dst_file_path)
 
     def delete(self, file_path: str):
         """
@@ -106,6 +466,7 @@ class YOPStorage:
 
         :param file_path: The path to the file on the server.
         """
+        self.invalidate_cache()
         self._do_delete(file_path)
 
     def list_files(self, list_path: str, print_result: bool = False, verbose: bool = False) -> list[dict]:
@@ -121,7 +482,7 @@ class YOPStorage:
             print_ls(list_files)
         return list_files
 
-    def _do_delete(self, file_path: str) -> Response:
+    def _do_delete(self, file_path: str) -> 'Response | httpx.Response':
         """
         Handles the actual delete process from the server.
 
@@ -129,10 +490,11 @@ class YOPStorage:
         :return: The response from the server.
         """
 
-        url = urljoin(self._host_url, f'delete/{file_path}')
+        url = f'{self._delete_prefix}{file_path}'
 
-        headers = self._headers
-        response = requests.delete(url, headers=headers)
+        # a plain dict: older httpx releases (0.23) take headers only as a dict, not any mapping
+        headers = dict(self._headers)
+        response = self._metadata_client.delete(url, headers=headers)
         if response.status_code == 404:
             raise FileNotFoundError(f'File "{file_path}" not found on server')
         elif response.status_code != 204:
@@ -141,81 +503,291 @@ class YOPStorage:
 
     def _do_upload(
             self,
-            file_chunks_generator: Iterable,
+            file_chunks_generator: Iterable | BinaryIO | bytes,
             dst_file_path: str,
             isdir: bool,
-            file_size: int,
+            file_size: int | None,
             force: bool,
+            check: bool = True,
     ) -> Response:
         """
         Handles the actual upload process to the server.
 
-        :param file_chunks_generator: An iterable that yields file chunks to be uploaded.
+        :param file_chunks_generator: An iterable that yields file chunks, a file-like object or the whole file as bytes.
         :param dst_file_path: The destination file path on the server.
         :param isdir: Whether uploaded file is archive of a directory
+        :param file_size: The size of the uploaded file, or None if it is streamed with unknown size.
+        :param check: Whether to check headers with a preflight request before sending the body.
         :return: The response from the server.
         """
-        url = urljoin(self._host_url, f'upload/?force={str(force).lower()}')
+        url = self._get_upload_url(force)
+        headers = self._get_upload_headers(dst_file_path, isdir, file_size)
 
-        headers = {
-            **self._headers,
-            'Content-Disposition': f'attachment; filename="{dst_file_path}"',
-            'X-File-Size': str(file_size),
-        }
-        if isdir:
-            headers['X-Is-Archive'] = 'true'
+        if check:
+            self._check_upload(url, headers)
 
-        with requests.Session() as session:
-            # Check headers only aka "expect: 100-continue"
-            pre_request = session.post(
-                url,
-                headers={**headers, 'X-Expect': '100-continue'},
-                stream=True  # TODO: why stream
-            )
+        # not streamed: the short answer is read at once, so the connection goes back to the pool
+        response = self._session.post(url, headers=headers, data=file_chunks_generator)
+
+        if response.status_code != 200:
+            raise RuntimeError(f'Upload failed: {response.status_code} {response.text}')
+
+        return response
 
-            if pre_request.status_code >= 400:
-                raise RuntimeError(
-                    f'Upload failed: {pre_request.status_code} {pre_request.text}'
+    def _do_upload_sendfile(
+            self,
+            src_file: BinaryIO,
+            dst_file_path: str,
+            file_size: int,
+            force: bool,
+            pbar: tqdm,
+    ) -> None:
+        """
+        Handles the upload process over plain HTTP, sending the file body with socket.sendfile
+        so that file bytes are never copied through user space.
+        It uses its own connection, so it is only taken when no proxy is configured for the server
+        and the server URL carries no credentials.
+
+        :param src_file: The opened source file to be uploaded.
+        :param dst_file_path: The destination file path on the server.
+        :param file_size: The size of the source file in bytes.
+        :param pbar: The progress bar to be updated with sent bytes.
+        """
+        url = self._get_upload_url(force)
+        headers = self._get_upload_headers(dst_file_path, isdir=False, file_size=file_size)
+
+        self._check_upload(url, headers)
+
+        split_url = urlsplit(url)
+        # hostname is unbracketed, so an IPv6 literal needs an explicit port to not be split at its colons
+        conn = http.client.HTTPConnection(split_url.hostname, split_url.port or 80, timeout=SENDFILE_TIMEOUT)
+        try:
+            conn.putrequest('POST', f'{split_url.path}?{split_url.query}')
+            for header, value in headers.items():
+                conn.putheader(header, value)
+            conn.putheader('Content-Length', str(file_size))
+            conn.endheaders()
+
+            offset = 0
+            try:
+                while offset < file_size:
+                    sent = conn.sock.sendfile(src_file, offset, min(SENDFILE_BLOCK_SIZE, file_size - offset))
+                    if not sent:
+                        raise RuntimeError(f'Upload failed: file was truncated at {offset} bytes')
+                    offset += sent
+                    pbar.update(sent)
+            except (BrokenPipeError, ConnectionResetError) as e:
+                # the server stopped reading the body, most likely to reject it: report its answer if it sent one
+                try:
+                    response = conn.getresponse()
+                    response_text = response.read().decode(errors='replace')
+                except (OSError, http.client.HTTPException):
+                    raise e
+                raise RuntimeError(f'Upload failed: {response.status} {response_text}') from e
+
+            response = conn.getresponse()
+            response_text = response.read().decode(errors='replace')
+            if response.status != 200:
+                raise RuntimeError(f'Upload failed: {response.status} {response_text}')
+        finally:
+            conn.close()
+
+    def _do_upload_multipart(
+            self,
+            src_file: BinaryIO,
+            dst_file_path: str,
+            file_size: int,
+            force: bool,
+            pbar: tqdm,
+            part_size: int = MULTIPART_PART_SIZE,
+            max_workers: int = MULTIPART_MAX_WORKERS,
+    ) -> None:
+        """
+        Handles the upload process as several parts sent in parallel.
+
+        The upload is opened with ``POST upload/start/`` (same headers as a regular upload), which returns
+        ``{"upload_id": ...}``. Every part is sent with ``POST upload/part/?upload_id=...&index=...``
+        and the server assembles them in index order on ``POST upload/complete/?upload_id=...``.
+        If the upload fails, ``POST upload/abort/?upload_id=...`` asks the server to drop the parts received so far.
+
+        :param src_file: The opened source file to be uploaded.
+        :param dst_file_path: The destination file path on the server.
+        :param file_size: The size of the source file in bytes.
+        :param pbar: The progress bar to be updated with sent bytes.
+        :param part_size: The size of one part in bytes.
+        :param max_workers: The number of parts uploaded concurrently.
+        """
+        headers = self._get_upload_headers(dst_file_path, isdir=False, file_size=file_size)
+        num_parts = max(1, math.ceil(file_size / part_size))
+        num_workers = min(max_workers, num_parts)
+
+        response = self._session.post(
+            f'{self._upload_prefix}start/?force={str(force).lower()}', headers=headers
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f'Upload failed: {response.status_code} {response.text}')
+        upload_id = response.json()['upload_id']
+
+        # bounded pool of part buffers: reading blocks until a sent part returns its buffer
+        buffers = BufferPool(min(part_size, file_size), num_workers)
+        pbar_lock = threading.Lock()
+        failed = threading.Event()
+
+        def upload_part(index: int, buffer: bytearray, size: int) -> None:
+            try:
+                part_response = self._session.post(
+                    f'{self._upload_prefix}part/?upload_id={upload_id}&index={index}',
+                    headers=self._headers,
+                    data=memoryview(buffer)[:size]
                 )
+                if part_response.status_code != 200:
+                    raise RuntimeError(
+                        f'Upload of part {index} failed: {part_response.status_code} {part_response.text}'
+                    )
+                with pbar_lock:
+                    pbar.update(size)
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                buffers.release(buffer)
 
-            response = session.post(
-                url, headers=headers, data=file_chunks_generator, stream=True
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = []
+                for index in range(num_parts):
+                    buffer = buffers.acquire()
+                    if failed.is_set():
+                        buffers.release(buffer)
+                        break
+                    size = min(part_size, file_size - index * part_size)
+                    try:
+                        self._read_part(src_file, buffer, size)
+                    except BaseException:
+                        buffers.release(buffer)
+                        raise
+                    futures.append(executor.submit(upload_part, index, buffer, size))
+                for future in futures:
+                    future.result()
+
+            response = self._session.post(
+                f'{self._upload_prefix}complete/?upload_id={upload_id}', headers=headers
             )
-
             if response.status_code != 200:
                 raise RuntimeError(f'Upload failed: {response.status_code} {response.text}')
+        except BaseException:
+            # best effort: the original error is what the caller needs to see
+            try:
+                self._session.post(f'{self._upload_prefix}abort/?upload_id={upload_id}', headers=self._headers)
+            except requests.RequestException:
+                pass
+            raise
+
+    @staticmethod
+    def _read_part(src_file: BinaryIO, buffer: bytearray, size: int) -> None:
+        # unbuffered reads may return less than asked for: keep reading until the part is complete
+        view = memoryview(buffer)[:size]
+        filled = 0
+        while filled < size:
+            n = src_file.readinto(view[filled:])
+            if not n:
+                raise RuntimeError(f'Upload failed: file was truncated while reading a {size} bytes part')
+            filled += n
+
+    def _get_upload_url(self, force: bool) -> str:
+        return f'{self._upload_prefix}?force={str(force).lower()}'
+
+    def _get_upload_headers(self, dst_file_path: str, isdir: bool, file_size: int | None) -> dict:
+        headers = dict(self._headers)
+        headers['Content-Disposition'] = f'attachment; filename="{dst_file_path}"'
+        if file_size is not None:
+            headers['X-File-Size'] = str(file_size)
+        if isdir:
+            headers['X-Is-Archive'] = 'true'
+        return headers
+
+    def _check_upload(self, url: str, headers: dict) -> None:
+        # Check headers only aka "expect: 100-continue".
+        # HEAD has no body on either side, so its pooled connection is free again for the upload itself
+        pre_request = self._session.head(url, headers={**headers, 'X-Expect': '100-continue'})
 
-            return response
+        if pre_request.status_code >= 400:
+            raise RuntimeError(
+                f'Upload failed: {pre_request.status_code} {pre_request.reason}'
+            )
 
-    def _do_download(self, src_file_path: str, dst_file_path: str, isdir: bool) -> None:
+    def _do_download(self, src_file_path: str, isdir: bool = False, check: bool = True) -> Response:
         """
-        Handles the actual download process from the server.
+        Handles the actual download request to the server.
 
         :param src_file_path: The path to the source file on the server.
-        :param dst_file_path: The destination file path on the local machine.
-        :param isdir: Whether downloaded file is archive of a directory
+        :param isdir: Whether to explicitly request an archive of a directory (legacy servers only)
+        :param check: Whether to raise if the server did not answer with 200.
+        :return: The streamed response from the server.
         """
-        url = urljoin(self._host_url, f'download/{src_file_path}')
+        url = f'{self._download_prefix}{src_file_path}'
 
         headers = self._headers
         if isdir:
+            headers = dict(self._headers)
             headers['X-Is-Archive'] = 'true'
-        response = requests.get(url, headers=self._headers, stream=True)
+        response = self._session.get(url, headers=headers, stream=True)
+
+        if check:
+            self._check_download_response(response, src_file_path)
+
+        return response
 
+    @staticmethod
+    def _check_download_response(response: Response, src_file_path: str) -> None:
         if response.status_code == 404:
+            response.close()
             raise FileNotFoundError(f'File "{src_file_path}" not found on server')
         elif response.status_code != 200:
+            # reading the body releases the streamed connection back to the pool
             raise Exception(f'Failed to download file: {response.text}')
 
+    @staticmethod
+    def _save_response(response: Response, dst_file_path: str) -> None:
+        """
+        Writes a streamed response body to a local file.
+
+        :param response: The streamed response from the server.
+        :param dst_file_path: The destination file path on the local machine.
+        """
         file_size = int(response.headers.get('Content-Length', 0))
 
         with open(dst_file_path, 'wb') as f:
-            with tqdm(total=file_size, unit='B', unit_scale=True, desc=dst_file_path) as pbar:
-                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                    f.write(chunk)
-                    pbar.update(len(chunk))
+            with progress_bar(total=file_size, desc=dst_file_path) as pbar:
+                shutil.copyfileobj(ResponseReader(response, pbar), f, length=DOWNLOAD_CHUNK_SIZE)
+
+    @staticmethod
+    def _extract_response(response: Response, dst_dir_path: str) -> None:
+        """
+        Extracts a streamed directory archive into a local directory without saving the archive.
+
+        :param response: The streamed response from the server.
+        :param dst_dir_path: The destination directory path on the local machine.
+        """
+        file_size = int(response.headers.get('Content-Length', 0))
+        # 'data' filter refuses absolute paths and links pointing outside the destination (Python 3.11.4+)
+        extract_kwargs = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+        with progress_bar(total=file_size, desc=dst_dir_path) as pbar:
+            try:
+                reader = ResponseReader(response, pbar)
+                with tarfile.open(fileobj=reader, mode='r|gz') as tar:
+                    tar.extractall(dst_dir_path, **extract_kwargs)
+                # tarfile may stop before the end of the body
+                reader.flush()
+            except tarfile.TarError as e:
+                raise RuntimeError(f'Failed to unzip folder: {e}')
 
     def _is_file_on_server_dir(self, src_file_path: str) -> bool:
+        isdir = self._is_dir_cache.get(src_file_path)
+        if isdir is not None:
+            return isdir
+
         response = self._do_list_files(src_file_path, verbose=False)
         base_name = os.path.basename(src_file_path)
         if response.status_code == 404:
@@ -223,17 +795,24 @@ class YOPStorage:
         elif response.status_code != 200:
             raise Exception(f'Failed to browse file on server: {response.text}')
 
-        return not (len(response.json()) == 1 and base_name == response.json()[0]['name'])
+        list_files = response.json()
+        isdir = not (len(list_files) == 1 and base_name == list_files[0]['name'])
+
+        if len(self._is_dir_cache) >= IS_DIR_CACHE_SIZE:
+            # evict the oldest entry, dicts keep insertion order
+            self._is_dir_cache.pop(next(iter(self._is_dir_cache)))
+        self._is_dir_cache[src_file_path] = isdir
+        return isdir
 
-    def _do_list_files(self, list_path: str, verbose: bool) -> Response:
+    def _do_list_files(self, list_path: str, verbose: bool) -> 'Response | httpx.Response':
         """
         Handles the actual ls (list_files) process on the server.
         :param list_path: The path to the directory for listing files.
         :param verbose: If True, return with list of files their sizes.
         :return:
         """
-        url = urljoin(self._host_url, f'ls/{list_path}/?verbose={str(verbose).lower()}')
-        response = requests.get(url, headers=self._headers)
+        url = f'{self._ls_prefix}{list_path}/?verbose={str(verbose).lower()}'
+        response = self._metadata_client.get(url, headers=dict(self._headers))
         if response.status_code == 404:
             raise FileNotFoundError(f'File "{list_path}" not found on server')
         elif response.status_code != 200: